@@ -4,17 +4,68 @@ Handles answer optimization requests using RAG + Groq LLM
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+import asyncio
+import io
+import json
+import logging
 import os
-from groq import Groq
+from groq import AsyncGroq
+from langchain_core.documents import Document
 from app.services.rag_engine import RAGEngine
+from app.services.cache import CacheEntry, SemanticCache
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Groq client singleton - reuses one connection pool across requests
+groq_api_key = os.getenv('GROQ_API_KEY')
+if not groq_api_key:
+    logger.warning("⚠️ GROQ_API_KEY not found in environment variables - /ask will fail until it is set")
+groq_client = AsyncGroq(api_key=groq_api_key) if groq_api_key else None
 
 # Initialize RAG Engine (singleton-like pattern)
 rag_engine = RAGEngine()
 
+# Semantic cache for repeated/paraphrased questions (~500 * 384 * 4B = 768KB)
+response_cache = SemanticCache(max_size=500, threshold=0.95)
+# Only optimizer rewrites are cached; evaluator scores are specific to each student's answer
+CACHEABLE_MODES = frozenset({"optimizer"})
+
+
+def _completion_params(formatted_prompt: str) -> Dict[str, Any]:
+    """Groq chat completion parameters shared by the buffered and streaming paths."""
+    return dict(
+        model="llama-3.3-70b-versatile",
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an expert CBSE examiner helping students write better answers."
+            },
+            {
+                "role": "user",
+                "content": formatted_prompt
+            }
+        ],
+        temperature=0.3,  # Lower temperature for more consistent, factual responses
+        max_tokens=1024,
+        top_p=1
+    )
+
+
+async def _complete(client: Optional[AsyncGroq], formatted_prompt: str) -> str:
+    """Run a single Groq chat completion for an already formatted prompt."""
+    if client is None:
+        raise ValueError("GROQ_API_KEY not found in environment variables")
+    
+    logger.debug("🤖 Calling Groq LLM (llama-3.3-70b-versatile)...")
+    completion = await client.chat.completions.create(**_completion_params(formatted_prompt), stream=False)
+    return completion.choices[0].message.content
+
+
 # Pydantic models for request/response validation
 class AskRequest(BaseModel):
     """Request model for the /ask endpoint"""
@@ -30,61 +81,67 @@ class AskResponse(BaseModel):
     sources_count: int = Field(..., description="Number of relevant context chunks used")
 
 
-@router.post("/ask", response_model=AskResponse)
-async def ask_question(request: AskRequest):
-    """
-    Main endpoint for answer optimization/evaluation.
+def _log_request(request: AskRequest) -> None:
+    logger.debug(
+        "📥 Request received: subject=%s mode=%s question_length=%d",
+        request.subject,
+        request.mode,
+        len(request.question)
+    )
+
+
+async def _check_cache(request: AskRequest) -> Tuple[Optional[Tuple[float, ...]], Optional[CacheEntry]]:
+    """Embed the question and look it up in the semantic cache (skips Pinecone + Groq on a hit)."""
+    # Evaluations grade this exact answer - a near-duplicate (e.g. negated) answer must not reuse another score
+    if request.mode not in CACHEABLE_MODES:
+        return None, None
     
-    Mode: optimizer - Rewrites student answer in Official Marking Scheme format
-    Mode: evaluator - Evaluates student answer and provides feedback
-    """
+    query_embedding = None
+    try:
+        query_embedding = await asyncio.to_thread(rag_engine.embed_query, request.question)
+        cached = response_cache.get(query_embedding, request.subject, request.mode)
+        if cached is not None:
+            logger.debug("⚡ Semantic cache hit")
+        return query_embedding, cached
+    except Exception as e:
+        # The cache is an optimization only - fall through to the normal path
+        logger.warning("⚠️ Semantic cache lookup failed: %s", e)
+        return query_embedding, None
+
+
+async def _retrieve_context(request: AskRequest) -> List[Document]:
+    """Search for relevant context from marking schemes."""
     try:
-        print(f"\n📥 Request received:")
-        print(f"   - Subject: {request.subject}")
-        print(f"   - Mode: {request.mode}")
-        print(f"   - Question length: {len(request.question)} chars")
+        # Pinecone's client is sync - run it off the event loop
+        relevant_docs = await asyncio.to_thread(
+            rag_engine.search,
+            query=request.question,
+            subject=request.subject,
+            k=3
+        )
         
-        # Step 1: Initialize Vector DB connection (lazy initialization)
-        try:
-            rag_engine.initialize_vector_db()
-        except Exception as e:
-            print(f"❌ Vector DB initialization failed: {str(e)}")
+        if not relevant_docs:
+            logger.warning("⚠️ No relevant documents found for subject: %s", request.subject)
             raise HTTPException(
-                status_code=500,
-                detail=f"Database connection failed. Please check Pinecone configuration. Error: {str(e)}"
+                status_code=404,
+                detail=f"No marking scheme data found for subject '{request.subject}'. Please ensure PDFs are uploaded."
             )
         
-        # Step 2: Search for relevant context from marking schemes
-        try:
-            relevant_docs = rag_engine.search(
-                query=request.question,
-                subject=request.subject,
-                k=3
-            )
-            
-            if not relevant_docs:
-                print(f"⚠️ No relevant documents found for subject: {request.subject}")
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"No marking scheme data found for subject '{request.subject}'. Please ensure PDFs are uploaded."
-                )
-            
-            # Combine retrieved context
-            context = "\n\n".join([doc.page_content for doc in relevant_docs])
-            print(f"✅ Retrieved {len(relevant_docs)} relevant chunks")
-            
-        except HTTPException:
-            raise  # Re-raise HTTP exceptions as-is
-        except Exception as e:
-            print(f"❌ Search failed: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Search operation failed: {str(e)}"
-            )
+        logger.debug("✅ Retrieved %d relevant chunks", len(relevant_docs))
+        return relevant_docs
         
-        # Step 3: Create system prompt based on mode
-        if request.mode == "optimizer":
-            system_prompt = """You are an expert CBSE examiner and answer optimizer.
+    except HTTPException:
+        raise  # Re-raise HTTP exceptions as-is
+    except Exception as e:
+        logger.error("❌ Search failed: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Search operation failed: {str(e)}"
+        )
+
+
+# Mode-specific prompt templates ({context} and {question} are filled in by _build_prompt)
+OPTIMIZER_PROMPT = """You are an expert CBSE examiner and answer optimizer.
 
 Your task: Transform the student's answer into the perfect "Official Marking Scheme" format that maximizes marks.
 
@@ -102,9 +159,8 @@ Student's Answer:
 {question}
 
 Provide the optimized answer in bullet-point format with bold keywords:"""
-        
-        else:  # evaluator mode
-            system_prompt = """You are an expert CBSE examiner evaluating a student's answer.
+
+EVALUATOR_PROMPT = """You are an expert CBSE examiner evaluating a student's answer.
 
 Your task: Evaluate the student's answer against the official marking scheme and provide constructive feedback.
 
@@ -130,51 +186,95 @@ Provide evaluation in this format:
 
 **Suggestions for Improvement:**
 - [Actionable advice]"""
+
+
+def _split_template(template: str) -> Tuple[str, str, str]:
+    """Split a template into the text before {context}, between the placeholders, and after {question}."""
+    header, rest = template.split("{context}")
+    middle, footer = rest.split("{question}")
+    return header, middle, footer
+
+
+_PROMPT_PARTS: Dict[str, Tuple[str, str, str]] = {
+    "optimizer": _split_template(OPTIMIZER_PROMPT),
+    "evaluator": _split_template(EVALUATOR_PROMPT),
+}
+
+
+def _build_prompt(request: AskRequest, relevant_docs: List[Document]) -> str:
+    """Create the mode-specific prompt with the retrieved context and student's answer."""
+    # Write header, context chunks and question into one buffer in a single pass
+    # (no intermediate context string or list, no second copy from str.format)
+    header, middle, footer = _PROMPT_PARTS[request.mode]
+    prompt = io.StringIO()
+    prompt.write(header)
+    for i, doc in enumerate(relevant_docs):
+        if i:
+            prompt.write("\n\n")
+        prompt.write(doc.page_content)
+    prompt.write(middle)
+    prompt.write(request.question)
+    prompt.write(footer)
+    return prompt.getvalue()
+
+
+def _cache_answer(request: AskRequest, query_embedding: Optional[Tuple[float, ...]], answer: str, sources_count: int) -> None:
+    """Store a freshly generated answer in the semantic cache."""
+    if query_embedding is not None and request.mode in CACHEABLE_MODES:
+        response_cache.put(query_embedding, request.subject, request.mode, answer, sources_count)
+
+
+def _groq_error(e: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=500,
+        detail=f"AI processing failed. Please check Groq API configuration. Error: {str(e)}"
+    )
+
+
+def _sse(payload: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Event (JSON keeps newlines in tokens from breaking the frame)."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@router.post("/ask", response_model=AskResponse)
+async def ask_question(request: AskRequest):
+    """
+    Main endpoint for answer optimization/evaluation.
+    
+    Mode: optimizer - Rewrites student answer in Official Marking Scheme format
+    Mode: evaluator - Evaluates student answer and provides feedback
+    """
+    try:
+        _log_request(request)
         
-        # Format the prompt with context and question
-        formatted_prompt = system_prompt.format(
-            context=context,
-            question=request.question
-        )
+        # Step 1: Check the semantic cache
+        query_embedding, cached = await _check_cache(request)
+        if cached is not None:
+            return AskResponse(
+                answer=cached.answer,
+                mode=request.mode,
+                subject=request.subject,
+                sources_count=cached.sources_count
+            )
+        
+        # Step 2: Search for relevant context from marking schemes
+        relevant_docs = await _retrieve_context(request)
+        
+        # Step 3: Create prompt based on mode
+        formatted_prompt = _build_prompt(request, relevant_docs)
         
         # Step 4: Call Groq LLM
         try:
-            groq_api_key = os.getenv('GROQ_API_KEY')
-            if not groq_api_key:
-                raise ValueError("GROQ_API_KEY not found in environment variables")
-            
-            client = Groq(api_key=groq_api_key)
-            
-            print(f"🤖 Calling Groq LLM (llama-3.3-70b-versatile)...")
-            completion = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert CBSE examiner helping students write better answers."
-                    },
-                    {
-                        "role": "user",
-                        "content": formatted_prompt
-                    }
-                ],
-                temperature=0.3,  # Lower temperature for more consistent, factual responses
-                max_tokens=1024,
-                top_p=1,
-                stream=False
-            )
-            
-            ai_response = completion.choices[0].message.content
-            print(f"✅ AI Response generated ({len(ai_response)} chars)")
+            ai_response = await _complete(groq_client, formatted_prompt)
+            logger.debug("✅ AI Response generated (%d chars)", len(ai_response))
             
         except Exception as e:
-            print(f"❌ Groq API call failed: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"AI processing failed. Please check Groq API configuration. Error: {str(e)}"
-            )
+            logger.error("❌ Groq API call failed: %s", e)
+            raise _groq_error(e)
+        
+        # Step 5: Cache and return response
+        _cache_answer(request, query_embedding, ai_response, len(relevant_docs))
         
-        # Step 5: Return response
         return AskResponse(
             answer=ai_response,
             mode=request.mode,
@@ -186,7 +286,88 @@ Provide evaluation in this format:
         raise  # Re-raise HTTP exceptions
     except Exception as e:
         # Catch-all for unexpected errors
-        print(f"❌ Unexpected error: {str(e)}")
+        logger.exception("❌ Unexpected error: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+@router.post("/ask/stream")
+async def ask_question_stream(request: AskRequest):
+    """
+    Streaming variant of /ask using Server-Sent Events.
+    
+    Each event is `data: <json>`: {"token": ...} while the answer is generated,
+    then a final {"done": true, "mode", "subject", "sources_count"} event,
+    or {"error": ...} if generation fails mid-stream.
+    Errors before the first token are returned as regular HTTP errors.
+    """
+    try:
+        _log_request(request)
+        
+        # Step 1: Check the semantic cache - replay a hit as a single token
+        query_embedding, cached = await _check_cache(request)
+        if cached is not None:
+            async def replay_cached() -> AsyncIterator[str]:
+                yield _sse({"token": cached.answer})
+                yield _sse({"done": True, "mode": request.mode, "subject": request.subject, "sources_count": cached.sources_count})
+            
+            return StreamingResponse(replay_cached(), media_type="text/event-stream")
+        
+        # Step 2: Search for relevant context from marking schemes
+        relevant_docs = await _retrieve_context(request)
+        
+        # Step 3: Create prompt based on mode
+        formatted_prompt = _build_prompt(request, relevant_docs)
+        
+        # Step 4: Open the Groq stream
+        try:
+            if groq_client is None:
+                raise ValueError("GROQ_API_KEY not found in environment variables")
+            
+            logger.debug("🤖 Streaming from Groq LLM (llama-3.3-70b-versatile)...")
+            stream = await groq_client.chat.completions.create(**_completion_params(formatted_prompt), stream=True)
+            
+        except Exception as e:
+            logger.error("❌ Groq API call failed: %s", e)
+            raise _groq_error(e)
+        
+        # Step 5: Forward tokens as they arrive, then cache the full answer
+        async def stream_answer() -> AsyncIterator[str]:
+            parts: List[str] = []
+            try:
+                async for chunk in stream:
+                    token = chunk.choices[0].delta.content if chunk.choices else None
+                    if token:
+                        parts.append(token)
+                        yield _sse({"token": token})
+            except Exception as e:
+                logger.error("❌ Groq stream failed: %s", e)
+                yield _sse({"error": f"AI processing failed mid-stream. Error: {str(e)}"})
+                return
+            finally:
+                # Also runs on client disconnect (CancelledError) - releases the pooled
+                # connection and stops Groq generating tokens nobody will read
+                await stream.close()
+            
+            ai_response = "".join(parts)
+            logger.debug("✅ AI Response streamed (%d chars)", len(ai_response))
+            _cache_answer(request, query_embedding, ai_response, len(relevant_docs))
+            yield _sse({"done": True, "mode": request.mode, "subject": request.subject, "sources_count": len(relevant_docs)})
+        
+        # The background close covers the case where the generator never starts
+        return StreamingResponse(
+            stream_answer(),
+            media_type="text/event-stream",
+            background=BackgroundTask(stream.close)
+        )
+    
+    except HTTPException:
+        raise  # Re-raise HTTP exceptions
+    except Exception as e:
+        # Catch-all for unexpected errors
+        logger.exception("❌ Unexpected error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
@@ -199,5 +380,5 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "BoardMax Chat API",
-        "endpoints": ["/ask", "/health"]
+        "endpoints": ["/ask", "/ask/stream", "/health"]
     }
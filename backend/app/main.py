@@ -1,12 +1,23 @@
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 # CRITICAL: Load environment variables FIRST before any other imports
 load_dotenv()
 
+# INFO in production so DEBUG-level request logs are skipped without formatting
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
 # Now import FastAPI and other dependencies
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -14,9 +25,23 @@ from slowapi.errors import RateLimitExceeded
 # Import chat module after dotenv is loaded
 from app.api import chat
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load embeddings + connect Pinecone before serving traffic so the first request isn't cold
+    try:
+        await asyncio.to_thread(chat.rag_engine.initialize_vector_db)
+        # Warm up the embedding model (loads the ONNX session and kernels)
+        await asyncio.to_thread(chat.rag_engine.embed_query, "warmup")
+    except Exception as e:
+        # Don't crash startup - requests will retry the lazy init and report the error
+        logger.error("❌ Vector DB startup initialization failed: %s", e)
+
+    yield
+
 # 1. Security & Config
 limiter = Limiter(key_func=get_remote_address)
-app = FastAPI(title="BoardMax API")
+# orjson (Rust) serializes responses several times faster than the stdlib json module
+app = FastAPI(title="BoardMax API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Allow Frontend to talk to Backend
 app.add_middleware(
@@ -39,4 +64,18 @@ def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    if os.getenv("DEBUG", "").lower() in ("1", "true", "yes"):
+        # Development: single process with auto-reload
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        # Production: one worker per core on uvloop + httptools (both ship with uvicorn[standard]).
+        # Each worker loads its own embedding model and keeps its own in-memory caches.
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=os.cpu_count() or 1,
+            loop="uvloop",
+            http="httptools",
+            log_level="warning"
+        )
\ No newline at end of file
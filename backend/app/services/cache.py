@@ -0,0 +1,115 @@
+"""
+Semantic Response Cache for BoardMax
+Short-circuits retrieval + LLM generation for repeated or paraphrased questions
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class CacheEntry:
+    """A cached answer together with the context it was generated for."""
+    subject: str
+    mode: str
+    answer: str
+    sources_count: int
+    created_at: float
+    last_used: float
+
+
+class SemanticCache:
+    """LRU + TTL cache keyed by (normalized) query embeddings.
+
+    Embeddings live in one preallocated matrix so a lookup is a single
+    matrix-vector product followed by a scan of the few rows above threshold.
+    """
+
+    def __init__(self, max_size: int = 500, ttl_seconds: float = 3600.0, threshold: float = 0.95):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._matrix: Optional[np.ndarray] = None  # Allocated on first insert (dim unknown until then)
+        self._entries: List[Optional[CacheEntry]] = [None] * max_size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def _is_expired(self, entry: CacheEntry, now: float) -> bool:
+        return now - entry.created_at > self.ttl_seconds
+
+    def get(self, embedding: Sequence[float], subject: str, mode: str) -> Optional[CacheEntry]:
+        """Return the most similar live entry for this subject/mode, if any clears the threshold."""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                return None
+
+            now = time.monotonic()
+            similarities = self._matrix @ query  # Empty slots are zero rows -> similarity 0
+            candidates = np.flatnonzero(similarities >= self.threshold)
+
+            for idx in candidates[np.argsort(similarities[candidates])[::-1]]:
+                entry = self._entries[idx]
+                if entry is None:
+                    continue
+                if self._is_expired(entry, now):
+                    self._evict(idx)
+                    continue
+                if entry.subject == subject and entry.mode == mode:
+                    entry.last_used = now
+                    return entry
+
+        return None
+
+    def put(self, embedding: Sequence[float], subject: str, mode: str, answer: str, sources_count: int) -> None:
+        """Store an answer, evicting the least recently used entry when full."""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                self._matrix = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self._entries = [None] * self.max_size
+
+            now = time.monotonic()
+            slot = self._find_slot(now)
+            self._matrix[slot] = vector
+            self._entries[slot] = CacheEntry(
+                subject=subject,
+                mode=mode,
+                answer=answer,
+                sources_count=sources_count,
+                created_at=now,
+                last_used=now
+            )
+
+    def _find_slot(self, now: float) -> int:
+        """Pick a free or expired slot, otherwise the least recently used one."""
+        lru_slot = 0
+        lru_time = float("inf")
+        for idx, entry in enumerate(self._entries):
+            if entry is None or self._is_expired(entry, now):
+                return idx
+            if entry.last_used < lru_time:
+                lru_slot, lru_time = idx, entry.last_used
+        return lru_slot
+
+    def _evict(self, idx: int) -> None:
+        if self._matrix is not None:
+            self._matrix[idx] = 0.0
+        self._entries[idx] = None
@@ -1,97 +1,252 @@
+import hashlib
+import logging
 import os
-from typing import List, Optional
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
+import msgpack
+import redis
 from langchain_community.document_loaders import PyPDFLoader
 # UPDATED IMPORT:
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 # UPDATED IMPORT:
 from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
 from pinecone import Pinecone
 from langchain_pinecone import PineconeVectorStore
 
 # Load env variables if this file is run directly, otherwise main app handles it
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Collapses newlines, tabs and repeated spaces in one pass
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Retrieved context is shared across workers/pods via Redis (marking schemes rarely change)
+SEARCH_CACHE_TTL_SECONDS = 3600
+# Fail fast to Pinecone if Redis is unreachable instead of waiting out the OS TCP timeout
+REDIS_TIMEOUT_SECONDS = 0.25
+
+
+def _make_cached_embedder(embeddings: FastEmbedEmbeddings, maxsize: int = 2048) -> Callable[[str], Tuple[float, ...]]:
+    """Memoize query embeddings so identical queries skip a MiniLM forward pass."""
+    @lru_cache(maxsize=maxsize)
+    def embed(query: str) -> Tuple[float, ...]:
+        # Tuples are immutable, so cached vectors can't be mutated by callers
+        return tuple(embeddings.embed_query(query))
+
+    return embed
+
+
+def _chunk_id(subject: str, source: str, page: str, chunk_index: int) -> str:
+    """Stable vector ID for the Nth chunk of a PDF page."""
+    return hashlib.sha256(f"{subject}::{source}::{page}::{chunk_index}".encode()).hexdigest()
+
+
 class RAGEngine:
     """RAG Engine for processing, uploading, and searching documents."""
     
     def __init__(self):
         """Initialize the Text Splitter (Embeddings/DB are lazy-loaded)."""
+        # Larger chunks keep marking-scheme points together and halve the vector count
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=50
+            chunk_size=1000,
+            chunk_overlap=100,
+            # Text is whitespace-normalized before splitting, so there are no newlines to split on
+            separators=[" ", ""]
         )
-        self.embeddings: Optional[HuggingFaceEmbeddings] = None
+        self.embeddings: Optional[FastEmbedEmbeddings] = None
         self.vector_store: Optional[PineconeVectorStore] = None
+        # Raw pinecone Index handle (its import path differs across pinecone versions, so it isn't imported)
+        self.index: Optional[Any] = None
+        self._embed_query: Optional[Callable[[str], Tuple[float, ...]]] = None
+        self.redis: Optional[redis.Redis] = None
+        self._init_lock = threading.Lock()
     
     def initialize_vector_db(self, index_name: str = "boardmax") -> None:
-        """Initialize Pinecone vector database with HuggingFace embeddings."""
+        """Initialize Pinecone vector database with FastEmbed (ONNX Runtime) embeddings."""
         if self.vector_store is not None:
             return # Already initialized
 
-        print("🔌 Initializing Vector Database connection...")
+        # Search/embed may fall back to lazy init from worker threads - only connect once
+        with self._init_lock:
+            if self.vector_store is not None:
+                return
+
+            logger.info("🔌 Initializing Vector Database connection...")
         
-        # 1. Initialize Embeddings (The Translator)
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name='sentence-transformers/all-MiniLM-L6-v2'
-        )
+            # 1. Validate config first so a missing key fails before any heavy loading
+            api_key = os.getenv('PINECONE_API_KEY')
+            if not api_key:
+                raise ValueError("PINECONE_API_KEY not found in environment variables")
         
-        # 2. Initialize Pinecone Client
-        api_key = os.getenv('PINECONE_API_KEY')
-        if not api_key:
-            raise ValueError("PINECONE_API_KEY not found in environment variables")
-            
-        pc = Pinecone(api_key=api_key)
+            # 2. Initialize Embeddings (The Translator) - kept across retries so the LRU cache survives
+            if self.embeddings is None:
+                # FastEmbed runs the same MiniLM weights as an fp32 ONNX Runtime graph (no int8 quantization)
+                self.embeddings = FastEmbedEmbeddings(
+                    model_name='sentence-transformers/all-MiniLM-L6-v2'
+                )
+                self._embed_query = _make_cached_embedder(self.embeddings)
         
-        # 3. Connect to the Index
-        self.vector_store = PineconeVectorStore(
-            index_name=index_name,
-            embedding=self.embeddings,
-            pinecone_api_key=api_key
-        )
-        print("✅ Vector Database Connected.")
+            # 3. Initialize Pinecone Client
+            pc = Pinecone(api_key=api_key)
+        
+            # 4. Connect to the Index (raw handle for queries, LangChain store for uploads)
+            self.index = pc.Index(index_name)
+            self.vector_store = PineconeVectorStore(
+                index_name=index_name,
+                embedding=self.embeddings,
+                pinecone_api_key=api_key
+            )
+
+            # 5. Optional shared search cache (disabled unless REDIS_URL is set)
+            redis_url = os.getenv('REDIS_URL')
+            if redis_url:
+                self.redis = redis.Redis.from_url(
+                    redis_url,
+                    socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+                    socket_timeout=REDIS_TIMEOUT_SECONDS
+                )
+            logger.info("✅ Vector Database Connected.")
 
     def ingest_pdf(self, file_path: str, subject: str) -> List[Document]:
         """Load and process a PDF file into chunks with metadata."""
-        print(f"📄 Reading PDF: {file_path}")
+        logger.info("📄 Reading PDF: %s", file_path)
         loader = PyPDFLoader(file_path)
         documents = loader.load()
         
-        # Split into chunks
-        chunks = self.text_splitter.split_documents(documents)
+        # Normalize whitespace once per page (better embedding quality) instead of once per chunk
+        for document in documents:
+            document.page_content = _WHITESPACE_RE.sub(" ", document.page_content).strip()
+            document.metadata['subject'] = subject
         
-        # Add metadata (Crucial for filtering)
-        for chunk in chunks:
-            chunk.metadata['subject'] = subject
-            # Clean newlines for better embedding quality
-            chunk.page_content = chunk.page_content.replace("\n", " ")
+        # Split into chunks (each chunk inherits the page's subject metadata, used for namespace routing)
+        chunks = self.text_splitter.split_documents(documents)
         
         return chunks
 
-    def upload_documents(self, documents: List[Document]) -> None:
+    def upload_documents(self, documents: List[Document], batch_size: int = 100, max_workers: int = 8) -> None:
         """Uploads document chunks to the Pinecone Vector Store."""
         if not self.vector_store:
             self.initialize_vector_db()
         
         if not documents:
-            print("⚠️ No documents to upload.")
+            logger.warning("⚠️ No documents to upload.")
             return
 
-        print(f"🚀 Uploading {len(documents)} chunks to Pinecone...")
-        self.vector_store.add_documents(documents)
-        print("✅ Upload complete.")
+        logger.info("🚀 Uploading %d chunks to Pinecone...", len(documents))
+        # One namespace per subject, so searches only traverse that subject's vectors.
+        # IDs are deterministic so re-running an ingest overwrites vectors instead of duplicating them.
+        by_subject: Dict[str, List[Tuple[str, Document]]] = {}
+        chunk_counters: Dict[Tuple[str, str], int] = {}
+        for doc in documents:
+            page_key = (str(doc.metadata.get('source', '')), str(doc.metadata.get('page', '')))
+            chunk_index = chunk_counters.get(page_key, 0)
+            chunk_counters[page_key] = chunk_index + 1
+            subject = doc.metadata['subject']
+            by_subject.setdefault(subject, []).append((_chunk_id(subject, *page_key, chunk_index), doc))
+
+        # Pinecone upserts have per-call overhead, so send fixed-size batches,
+        # and run them on threads since the client releases the GIL during network I/O
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self.vector_store.add_documents,
+                    [doc for _id, doc in subject_docs[start:start + batch_size]],
+                    ids=[chunk_id for chunk_id, _doc in subject_docs[start:start + batch_size]],
+                    namespace=subject
+                )
+                for subject, subject_docs in by_subject.items()
+                for start in range(0, len(subject_docs), batch_size)
+            ]
+            for future in futures:
+                future.result()  # Re-raise the first upload error
+        logger.info("✅ Upload complete.")
+
+    def embed_query(self, query: str) -> Tuple[float, ...]:
+        """Embeds a query string, reusing the vector for repeated queries."""
+        if not self._embed_query:
+            self.initialize_vector_db()
+
+        return self._embed_query(query)
 
     def search(self, query: str, subject: str, k: int = 3) -> List[Document]:
         """Searches the vector DB for relevant chunks."""
         if not self.vector_store:
             self.initialize_vector_db()
             
-        print(f"🔍 Searching for '{query}' in subject: {subject}")
-        results = self.vector_store.similarity_search(
-            query,
-            k=k,
-            filter={"subject": subject}
+        cache_key = self._search_cache_key(query, subject, k)
+        cached = self._get_cached_search(cache_key)
+        if cached is not None:
+            return cached
+
+        logger.debug("🔍 Searching for %r in subject: %s", query, subject)
+        query_vector = self.embed_query(query)
+        # Query Pinecone directly - skips LangChain's retriever/callback layers on the hot path
+        response = self.index.query(
+            vector=list(query_vector),
+            top_k=k,
+            namespace=subject,
+            include_metadata=True
         )
-        return results
\ No newline at end of file
+        documents: List[Document] = []
+        for match in response["matches"]:
+            metadata = dict(match["metadata"] or {})
+            # PineconeVectorStore stores the chunk text under the "text" metadata key
+            if "text" not in metadata:
+                # Same as LangChain's similarity search: skip rather than return an empty chunk
+                logger.warning("⚠️ Found Pinecone match %s without text metadata, skipping", match["id"])
+                continue
+            text = metadata.pop("text")
+            documents.append(Document(page_content=text, metadata=metadata))
+        self._set_cached_search(cache_key, documents)
+        return documents
+
+    @staticmethod
+    def _search_cache_key(query: str, subject: str, k: int) -> str:
+        digest = hashlib.sha256(f"{subject}::{k}::{query}".encode()).hexdigest()
+        return f"boardmax:search:{digest}"
+
+    def _get_cached_search(self, key: str) -> Optional[List[Document]]:
+        """Returns cached search results from Redis, or None on a miss or Redis error."""
+        if self.redis is None:
+            return None
+        try:
+            payload = self.redis.get(key)
+        except redis.RedisError as e:
+            # The cache is an optimization only - fall back to Pinecone
+            logger.warning("⚠️ Redis search cache read failed: %s", e)
+            return None
+        if payload is None:
+            return None
+
+        try:
+            documents = [
+                Document(page_content=item["text"], metadata=item["metadata"])
+                for item in msgpack.unpackb(payload)
+            ]
+        except Exception as e:
+            # Corrupt or foreign value under our key - treat it as a miss
+            logger.warning("⚠️ Redis search cache entry %s could not be decoded: %s", key, e)
+            return None
+
+        logger.debug("⚡ Redis search cache hit")
+        return documents
+
+    def _set_cached_search(self, key: str, documents: List[Document]) -> None:
+        """Stores search results in Redis (msgpack: smaller and faster to parse than JSON)."""
+        if self.redis is None or not documents:
+            return
+        payload = msgpack.packb([
+            {"text": doc.page_content, "metadata": doc.metadata}
+            for doc in documents
+        ])
+        try:
+            self.redis.setex(key, SEARCH_CACHE_TTL_SECONDS, payload)
+        except redis.RedisError as e:
+            logger.warning("⚠️ Redis search cache write failed: %s", e)
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Tests for the semantic response cache
+"""
+
+import numpy as np
+import pytest
+
+from app.services import cache as cache_module
+from app.services.cache import SemanticCache
+
+
+class FakeClock:
+    """Stands in for time.monotonic so TTL and LRU order are deterministic."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+def _unit(*values: float) -> np.ndarray:
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_hit_above_threshold_and_miss_below(clock: FakeClock) -> None:
+    cache = SemanticCache(max_size=4, threshold=0.95)
+    cache.put([1.0, 0.0, 0.0], "Physics", "optimizer", "answer", 3)
+
+    # cos ~= 0.995 -> hit (unnormalized input is normalized by the cache)
+    hit = cache.get([10.0, 1.0, 0.0], "Physics", "optimizer")
+    assert hit is not None
+    assert hit.answer == "answer"
+    assert hit.sources_count == 3
+
+    # cos ~= 0.707 -> miss
+    assert cache.get([1.0, 1.0, 0.0], "Physics", "optimizer") is None
+
+
+def test_returns_most_similar_entry(clock: FakeClock) -> None:
+    cache = SemanticCache(max_size=4, threshold=0.9)
+    cache.put(_unit(1.0, 0.2, 0.0), "Physics", "optimizer", "close", 1)
+    cache.put(_unit(1.0, 0.0, 0.0), "Physics", "optimizer", "exact", 1)
+
+    assert cache.get([1.0, 0.0, 0.0], "Physics", "optimizer").answer == "exact"
+
+
+def test_subject_and_mode_are_isolated(clock: FakeClock) -> None:
+    cache = SemanticCache(max_size=4)
+    cache.put([1.0, 0.0], "Physics", "optimizer", "physics answer", 3)
+
+    assert cache.get([1.0, 0.0], "Chemistry", "optimizer") is None
+    assert cache.get([1.0, 0.0], "Physics", "evaluator") is None
+    assert cache.get([1.0, 0.0], "Physics", "optimizer").answer == "physics answer"
+
+
+def test_entries_expire_after_ttl(clock: FakeClock) -> None:
+    cache = SemanticCache(max_size=4, ttl_seconds=60.0)
+    cache.put([1.0, 0.0], "Physics", "optimizer", "answer", 3)
+
+    clock.now += 59.0
+    assert cache.get([1.0, 0.0], "Physics", "optimizer") is not None
+
+    clock.now += 2.0
+    assert cache.get([1.0, 0.0], "Physics", "optimizer") is None
+
+
+def test_evicts_least_recently_used_when_full(clock: FakeClock) -> None:
+    cache = SemanticCache(max_size=2)
+    cache.put([1.0, 0.0, 0.0], "Physics", "optimizer", "a", 1)
+    clock.now += 1.0
+    cache.put([0.0, 1.0, 0.0], "Physics", "optimizer", "b", 1)
+
+    # Touch "a" so "b" becomes the least recently used entry
+    clock.now += 1.0
+    assert cache.get([1.0, 0.0, 0.0], "Physics", "optimizer") is not None
+
+    clock.now += 1.0
+    cache.put([0.0, 0.0, 1.0], "Physics", "optimizer", "c", 1)
+
+    assert cache.get([1.0, 0.0, 0.0], "Physics", "optimizer").answer == "a"
+    assert cache.get([0.0, 1.0, 0.0], "Physics", "optimizer") is None
+    assert cache.get([0.0, 0.0, 1.0], "Physics", "optimizer").answer == "c"
+
+
+def test_zero_and_mismatched_vectors_are_ignored(clock: FakeClock) -> None:
+    cache = SemanticCache(max_size=2)
+    cache.put([0.0, 0.0], "Physics", "optimizer", "ignored", 1)
+    assert cache.get([0.0, 0.0], "Physics", "optimizer") is None
+
+    cache.put([1.0, 0.0], "Physics", "optimizer", "answer", 1)
+    assert cache.get([1.0, 0.0, 0.0], "Physics", "optimizer") is None
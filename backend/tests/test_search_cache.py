@@ -0,0 +1,133 @@
+"""
+Tests for the Redis-backed search cache in RAGEngine
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import msgpack
+import redis
+
+from app.services.rag_engine import SEARCH_CACHE_TTL_SECONDS, RAGEngine
+
+
+class StubRedis:
+    """Minimal stand-in for redis.Redis exposing only get/setex."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.store: Dict[str, bytes] = {}
+        self.ttls: Dict[str, int] = {}
+        self.fail = fail
+
+    def get(self, key: str) -> Optional[bytes]:
+        if self.fail:
+            raise redis.ConnectionError("Redis unreachable")
+        return self.store.get(key)
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        if self.fail:
+            raise redis.TimeoutError("Redis timed out")
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+
+class StubIndex:
+    """Stand-in for a pinecone Index that records queries."""
+
+    def __init__(self, matches: List[Dict[str, Any]]) -> None:
+        self.matches = matches
+        self.queries: List[Dict[str, Any]] = []
+
+    def query(self, **kwargs: Any) -> Dict[str, Any]:
+        self.queries.append(kwargs)
+        return {"matches": self.matches}
+
+
+def _engine(stub_redis: Optional[StubRedis], matches: List[Dict[str, Any]]) -> Tuple[RAGEngine, StubIndex]:
+    engine = RAGEngine()
+    index = StubIndex(matches)
+    engine.vector_store = object()  # Marks the engine as initialized (search only needs the index)
+    engine.index = index
+    engine._embed_query = lambda query: (1.0, 0.0)
+    engine.redis = stub_redis
+    return engine, index
+
+
+MATCHES = [
+    {"id": "a", "metadata": {"text": "Ohm's law: V = IR", "subject": "Physics", "page": 3}},
+    {"id": "b", "metadata": {"text": "Resistivity depends on material", "subject": "Physics", "page": 4}},
+]
+
+
+def test_miss_queries_pinecone_and_stores_result() -> None:
+    stub = StubRedis()
+    engine, index = _engine(stub, MATCHES)
+
+    docs = engine.search("What is Ohm's law?", "Physics", k=2)
+
+    assert [doc.page_content for doc in docs] == ["Ohm's law: V = IR", "Resistivity depends on material"]
+    assert docs[0].metadata == {"subject": "Physics", "page": 3}
+    assert len(index.queries) == 1
+    assert index.queries[0]["namespace"] == "Physics"
+    assert list(stub.ttls.values()) == [SEARCH_CACHE_TTL_SECONDS]
+
+
+def test_hit_reconstructs_documents_without_querying_pinecone() -> None:
+    stub = StubRedis()
+    engine, index = _engine(stub, MATCHES)
+    first = engine.search("What is Ohm's law?", "Physics", k=2)
+
+    second = engine.search("What is Ohm's law?", "Physics", k=2)
+
+    assert len(index.queries) == 1
+    assert [(doc.page_content, doc.metadata) for doc in second] == [(doc.page_content, doc.metadata) for doc in first]
+
+
+def test_key_depends_on_subject_and_k() -> None:
+    stub = StubRedis()
+    engine, index = _engine(stub, MATCHES)
+
+    engine.search("What is Ohm's law?", "Physics", k=2)
+    engine.search("What is Ohm's law?", "Chemistry", k=2)
+    engine.search("What is Ohm's law?", "Physics", k=3)
+
+    assert len(index.queries) == 3
+    assert len(stub.store) == 3
+
+
+def test_undecodable_payload_is_a_miss() -> None:
+    stub = StubRedis()
+    engine, index = _engine(stub, MATCHES)
+    key = RAGEngine._search_cache_key("What is Ohm's law?", "Physics", 2)
+
+    for payload in (b"\xc1 not msgpack", msgpack.packb([{"unexpected": "shape"}]), msgpack.packb(42)):
+        stub.store[key] = payload
+        docs = engine.search("What is Ohm's law?", "Physics", k=2)
+        assert [doc.page_content for doc in docs] == ["Ohm's law: V = IR", "Resistivity depends on material"]
+
+    assert len(index.queries) == 3
+
+
+def test_redis_errors_fall_back_to_pinecone() -> None:
+    engine, index = _engine(StubRedis(fail=True), MATCHES)
+
+    docs = engine.search("What is Ohm's law?", "Physics", k=2)
+
+    assert len(docs) == 2
+    assert len(index.queries) == 1
+
+
+def test_empty_results_are_not_cached() -> None:
+    stub = StubRedis()
+    engine, _index = _engine(stub, [])
+
+    assert engine.search("What is Ohm's law?", "Physics", k=2) == []
+    assert stub.store == {}
+
+
+def test_matches_without_text_are_skipped() -> None:
+    stub = StubRedis()
+    engine, _index = _engine(stub, [{"id": "x", "metadata": {"subject": "Physics"}}] + MATCHES[:1])
+
+    docs = engine.search("What is Ohm's law?", "Physics", k=2)
+
+    assert [doc.page_content for doc in docs] == ["Ohm's law: V = IR"]
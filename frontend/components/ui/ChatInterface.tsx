@@ -17,6 +17,13 @@ interface Message {
   subject?: string;
 }
 
+// One Server-Sent Event from POST /api/ask/stream
+interface StreamEvent {
+  token?: string;
+  done?: boolean;
+  error?: string;
+}
+
 const subjects = ["Physics", "Chemistry", "Biology", "Math", "Computer Science", "English"];
 
 export default function ChatInterface() {
@@ -25,6 +32,7 @@ export default function ChatInterface() {
   const [subject, setSubject] = useState("Physics");
   const [mode, setMode] = useState<Mode>("optimizer");
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const handleSubmit = async (e: React.FormEvent) => {
@@ -49,7 +57,7 @@ export default function ChatInterface() {
     setIsLoading(true);
 
     try {
-      const response = await fetch("http://localhost:8000/api/ask", {
+      const response = await fetch("http://localhost:8000/api/ask/stream", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -65,22 +73,56 @@ export default function ChatInterface() {
         const errorData = await response.json();
         throw new Error(errorData.detail || "Request failed");
       }
+      if (!response.body) {
+        throw new Error("Streaming is not supported by this browser");
+      }
 
-      const data = await response.json();
-
-      const aiMessage: Message = {
-        role: "assistant",
-        content: data.answer,
-        mode: data.mode,
-        subject: data.subject,
+      // Append tokens to the assistant message as they arrive
+      const appendToken = (token: string, isFirst: boolean) => {
+        setMessages((prev) => {
+          if (isFirst) {
+            return [...prev, { role: "assistant", content: token, mode, subject }];
+          }
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, content: last.content + token }];
+        });
       };
 
-      setMessages((prev) => [...prev, aiMessage]);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let started = false;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop() ?? "";
+
+        for (const event of events) {
+          if (!event.startsWith("data: ")) continue;
+          const payload: StreamEvent = JSON.parse(event.slice("data: ".length));
+
+          if (payload.error) {
+            throw new Error(payload.error);
+          }
+          if (payload.token) {
+            appendToken(payload.token, !started);
+            if (!started) {
+              started = true;
+              setIsStreaming(true);
+            }
+          }
+        }
+      }
     } catch (err) {
       setError(err instanceof Error ? err.message : "An error occurred");
       console.error("Error:", err);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   };
 
@@ -239,7 +281,7 @@ export default function ChatInterface() {
               ))
             )}
 
-            {isLoading && (
+            {isLoading && !isStreaming && (
               <div className="flex justify-start">
                 <Card className="max-w-3xl p-4 bg-white border-2 border-gray-200">
                   <div className="flex items-center gap-3">
@@ -1,40 +1,61 @@
+import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List
 from dotenv import load_dotenv
 
 # Setup paths to find the backend module
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 load_dotenv(os.path.join(os.path.dirname(__file__), 'backend', '.env'))
+# Show the RAG engine's progress messages
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 from app.services.rag_engine import RAGEngine
+from langchain_core.documents import Document
+
+def parse_pdf(file_path: str, subject: str) -> List[Document]:
+    """Worker: parse one PDF into chunks (runs in a separate process)."""
+    # Splitting needs no DB connection, so each worker uses its own lightweight engine
+    return RAGEngine().ingest_pdf(file_path, subject)
 
 def main():
-    # 1. Start Engine
-    engine = RAGEngine()
-    
-    # 2. Connect DB
-    engine.initialize_vector_db("boardmax")
-    
-    # 3. Path to PDFs
+    # 1. Path to PDFs
     pdf_folder = "data/pdfs"
     
     if not os.path.exists(pdf_folder):
         print(f"❌ Error: Folder '{pdf_folder}' not found. Please create it and add PDFs.")
         return
 
-    # 4. Loop & Upload
-    for filename in os.listdir(pdf_folder):
-        if filename.endswith(".pdf"):
-            file_path = os.path.join(pdf_folder, filename)
-            subject = "social-science" # Hardcoded for MVP
-            
+    # 2. Parse PDFs in parallel (PyPDF parsing is CPU-bound, so processes beat threads).
+    # Nothing is connected or loaded yet, so forked workers don't inherit model/network state.
+    subject = "social-science" # Hardcoded for MVP
+    pdf_paths = [
+        os.path.join(pdf_folder, filename)
+        for filename in os.listdir(pdf_folder)
+        if filename.endswith(".pdf")
+    ]
+
+    all_chunks: List[Document] = []
+    with ProcessPoolExecutor() as executor:
+        futures = {executor.submit(parse_pdf, path, subject): path for path in pdf_paths}
+        for future in as_completed(futures):
             try:
-                # Get chunks
-                chunks = engine.ingest_pdf(file_path, subject)
-                # Upload
-                engine.upload_documents(chunks)
+                all_chunks.extend(future.result())
             except Exception as e:
-                print(f"❌ Failed {filename}: {e}")
+                print(f"❌ Failed {os.path.basename(futures[future])}: {e}")
+
+    # 3. Connect DB only once parsing is done
+    engine = RAGEngine()
+    engine.initialize_vector_db("boardmax")
+
+    # 4. Upload everything in one pass (batched inside upload_documents)
+    try:
+        engine.upload_documents(all_chunks)
+    except Exception as e:
+        print(f"❌ Upload failed after parsing {len(all_chunks)} chunks from {len(pdf_paths)} PDFs: {e}")
+        print("⚠️ The upload may be partial - some batches may already be in Pinecone. Re-run ingest.py to retry (chunk IDs are stable, so existing vectors are overwritten, not duplicated).")
+        return
 
     print("🎉 Ingestion Complete! Your AI is ready.")
 